@@ -1,29 +1,62 @@
 """pytest configuration and shared fixtures."""
 
+import textwrap
+from typing import Dict, Iterator
+
 import pytest
 from zetasql.api import Analyzer
 from zetasql.types import (
     AnalyzerOptions,
     LanguageOptions,
+    ResolvedStatement,
     SimpleCatalog,
 )
 
 from zetasql_demo.options import get_bigquery_language_options
-from zetasql_demo.catalog import create_sample_catalog
-from zetasql_demo.catalog import create_sample_catalog
+from zetasql_demo.catalog import RegisteredCatalogAnalyzer, create_sample_catalog
 
 
-@pytest.fixture
+class CachingAnalyzer:
+    """Analyzer proxy that memoizes analyze_statement() by SQL text.
+    
+    Lineage extractors only read resolved statements, so one analysis per
+    distinct statement can be shared by every test that uses it. Keys are
+    dedented and stripped so indentation differences between triple-quoted
+    literals still hit the cache. Other attributes delegate to the wrapped
+    analyzer; the proxy itself is not an Analyzer instance.
+    """
+    
+    def __init__(self, analyzer: Analyzer):
+        self._analyzer = analyzer
+        self._statements: Dict[str, ResolvedStatement] = {}
+    
+    def analyze_statement(self, sql: str) -> ResolvedStatement:
+        """Analyze a statement, reusing the result for repeated SQL."""
+        key = textwrap.dedent(sql).strip()
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._analyzer.analyze_statement(sql)
+            self._statements[key] = statement
+        return statement
+    
+    def __getattr__(self, name):
+        return getattr(self._analyzer, name)
+
+
+@pytest.fixture(scope="session")
 def bigquery_language_options() -> LanguageOptions:
     """BigQuery-compatible language options.
     
+    Session-scoped: built once per test process (once per worker under
+    pytest-xdist) and shared read-only by all tests.
+    
     Returns:
         LanguageOptions configured for BigQuery SQL dialect
     """
     return get_bigquery_language_options()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_catalog(bigquery_language_options: LanguageOptions) -> SimpleCatalog:
     """Create a sample catalog with test tables.
     
@@ -38,19 +71,27 @@ def sample_catalog(bigquery_language_options: LanguageOptions) -> SimpleCatalog:
     return create_sample_catalog(bigquery_language_options)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def analyzer(
     bigquery_language_options: LanguageOptions,
     sample_catalog: SimpleCatalog
-) -> Analyzer:
+) -> Iterator[CachingAnalyzer]:
     """Create an analyzer with BigQuery options and sample catalog.
     
+    The catalog is registered with the ZetaSQL service once for the whole
+    session, so each test's analyze_statement() call skips re-sending and
+    rebuilding it. Results are memoized by SQL text across the session.
+    A throwaway query warms the service up, so its one-off first-call cost
+    lands in fixture setup instead of the first test.
+    
     Args:
         bigquery_language_options: Language options
         sample_catalog: Sample catalog with tables
         
-    Returns:
-        Configured Analyzer instance
+    Yields:
+        CachingAnalyzer wrapping the registered-catalog Analyzer
     """
     options = AnalyzerOptions(language_options=bigquery_language_options)
-    return Analyzer(options, sample_catalog)
+    with RegisteredCatalogAnalyzer(options, sample_catalog) as registered_analyzer:
+        registered_analyzer.analyze_statement("SELECT 1")
+        yield CachingAnalyzer(registered_analyzer)
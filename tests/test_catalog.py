@@ -0,0 +1,39 @@
+"""Tests for catalog utilities."""
+
+from zetasql.api import Analyzer
+from zetasql.types import AnalyzerOptions
+
+from zetasql_demo.catalog import RegisteredCatalogAnalyzer
+from zetasql_demo.lineage import extract_table_lineage
+
+
+class TestRegisteredCatalogAnalyzer:
+    """Tests for analyzing against a registered catalog."""
+    
+    SQL = """
+    SELECT o.order_id, c.name
+    FROM `project1.dataset1.orders` o
+    JOIN `project1.dataset1.customers` c
+    ON o.customer_id = c.customer_id
+    """
+    
+    def test_matches_plain_analyzer(self, bigquery_language_options, sample_catalog):
+        """Test that registered and per-call catalogs resolve the same lineage."""
+        options = AnalyzerOptions(language_options=bigquery_language_options)
+        plain = Analyzer(options, sample_catalog)
+        
+        with RegisteredCatalogAnalyzer(options, sample_catalog) as registered:
+            assert registered.registered_catalog_id is not None
+            registered_lineage = extract_table_lineage(registered.analyze_statement(self.SQL))
+        
+        assert registered_lineage == extract_table_lineage(plain.analyze_statement(self.SQL))
+    
+    def test_close_falls_back_to_sending_catalog(self, bigquery_language_options, sample_catalog):
+        """Test that a closed analyzer still analyzes by sending the catalog."""
+        options = AnalyzerOptions(language_options=bigquery_language_options)
+        registered = RegisteredCatalogAnalyzer(options, sample_catalog)
+        registered.close()
+        
+        assert registered.registered_catalog_id is None
+        lineage = extract_table_lineage(registered.analyze_statement(self.SQL))
+        assert lineage.sources == {"project1.dataset1.orders", "project1.dataset1.customers"}
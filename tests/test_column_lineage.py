@@ -3,15 +3,75 @@
 Tests port examples from Java zetasql-toolkit and add Python-specific cases.
 """
 
+import dataclasses
+import pickle
+
 import pytest
+from zetasql.types import ResolvedColumn, StructField, StructType, Type, TypeKind
 
 from zetasql_demo.lineage.column_lineage import (
     ColumnLineageExtractor,
     ExpressionParentFinder,
     ParentColumnFinder,
+    expand_struct_column,
 )
 from zetasql_demo.lineage.models import ColumnEntity, ColumnLineage
 
+# Source columns shared across assertions
+_CATALOG_TITLE = ColumnEntity("product_catalog", "title")
+_CATALOG_COMMENT = ColumnEntity("product_catalog", "comment")
+_CATALOG_PRICE = ColumnEntity("product_catalog", "price")
+_STAGING_TITLE = ColumnEntity("product_catalog_staging", "title")
+_STAGING_COMMENT = ColumnEntity("product_catalog_staging", "comment")
+_SALES_PRODUCT_ID = ColumnEntity("sales", "product_id")
+_SALES_QUANTITY = ColumnEntity("sales", "quantity")
+_SALES_PRICE = ColumnEntity("sales", "price")
+
+# SELECT shared by the CREATE TABLE / CREATE VIEW multi-column tests
+_MULTI_COLUMN_SELECT = """
+        SELECT 
+            title,
+            UPPER(comment) AS upper_comment,
+            price
+        FROM product_catalog
+"""
+
+
+def _single_lineage(lineages):
+    """Return the only lineage, failing unless exactly one was extracted."""
+    assert len(lineages) == 1
+    return next(iter(lineages))
+
+
+class TestColumnEntity:
+    """Tests for ColumnEntity comparison semantics."""
+    
+    def test_column_name_is_case_insensitive(self):
+        """Test that column names compare and hash case-insensitively."""
+        entity = ColumnEntity("sales", "Quantity")
+        
+        assert entity.name == "Quantity"
+        assert entity.name_ci == "quantity"
+        assert entity == _SALES_QUANTITY
+        assert hash(entity) == hash(_SALES_QUANTITY)
+        assert entity != ColumnEntity("SALES", "quantity")
+    
+    def test_cached_values_are_not_fields(self):
+        """Test that the precomputed name_ci and hash stay out of the dataclass fields."""
+        assert [f.name for f in dataclasses.fields(ColumnEntity)] == ["table", "name"]
+        assert dataclasses.astuple(ColumnEntity("sales", "Quantity")) == ("sales", "Quantity")
+    
+    def test_pickle_round_trip(self):
+        """Test that pickling rebuilds entities from table and name, recomputing the hash."""
+        entity = ColumnEntity("sales", "Quantity")
+        
+        assert entity.__reduce__() == (ColumnEntity, ("sales", "Quantity"))
+        
+        restored = pickle.loads(pickle.dumps(entity))
+        assert restored == entity
+        assert restored.name_ci == "quantity"
+        assert restored in {_SALES_QUANTITY}
+
 
 class TestSimpleColumnLineage:
     """Basic column lineage tests."""
@@ -23,12 +83,11 @@ class TestSimpleColumnLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
     
     def test_column_with_alias(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage for column with alias."""
@@ -37,12 +96,11 @@ class TestSimpleColumnLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "product_title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
     
     def test_function_applied_to_column(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage for function applied to column."""
@@ -51,12 +109,11 @@ class TestSimpleColumnLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "upper_title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
     
     def test_multiple_columns_combined(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage for expression combining multiple columns."""
@@ -69,13 +126,12 @@ class TestSimpleColumnLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "combined")
         assert len(lineage.parents) == 2
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
-        assert ColumnEntity("product_catalog", "comment") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
+        assert _CATALOG_COMMENT in lineage.parents
     
     def test_arithmetic_expression(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage for arithmetic expression."""
@@ -88,44 +144,69 @@ class TestSimpleColumnLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "total_value")
         assert len(lineage.parents) == 2
-        assert ColumnEntity("sales", "price") in lineage.parents
-        assert ColumnEntity("sales", "quantity") in lineage.parents
+        assert _SALES_PRICE in lineage.parents
+        assert _SALES_QUANTITY in lineage.parents
     
-    def test_multiple_output_columns(self, sample_catalog, analyzer, bigquery_language_options):
-        """Test lineage with multiple output columns."""
-        query = """
-        CREATE TABLE result AS 
-        SELECT 
-            title,
-            UPPER(comment) AS upper_comment,
-            price
-        FROM product_catalog
-        """
+    @pytest.mark.parametrize("kind", ["TABLE", "VIEW"])
+    def test_multiple_output_columns(self, analyzer, kind):
+        """Test lineage with multiple output columns for CREATE TABLE and CREATE VIEW."""
+        query = f"CREATE {kind} result AS {_MULTI_COLUMN_SELECT}"
         
         analyzed = analyzer.analyze_statement(query)
-        lineages = ColumnLineageExtractor.extract(analyzed)
-        
-        assert len(lineages) == 3
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed)
         
-        # Convert to dict for easier checking
-        lineage_map = {lineage.target.name: lineage for lineage in lineages}
+        assert len(lineage_map) == 3
         
         # Check title
         assert lineage_map["title"].target == ColumnEntity("result", "title")
-        assert ColumnEntity("product_catalog", "title") in lineage_map["title"].parents
+        assert _CATALOG_TITLE in lineage_map["title"].parents
         
         # Check upper_comment
         assert lineage_map["upper_comment"].target == ColumnEntity("result", "upper_comment")
-        assert ColumnEntity("product_catalog", "comment") in lineage_map["upper_comment"].parents
+        assert _CATALOG_COMMENT in lineage_map["upper_comment"].parents
         
         # Check price
         assert lineage_map["price"].target == ColumnEntity("result", "price")
-        assert ColumnEntity("product_catalog", "price") in lineage_map["price"].parents
+        assert _CATALOG_PRICE in lineage_map["price"].parents
+    
+    def test_extract_selected_columns(self, analyzer):
+        """Test restricting extraction to selected target columns."""
+        query = f"CREATE TABLE result AS {_MULTI_COLUMN_SELECT}"
+        
+        analyzed = analyzer.analyze_statement(query)
+        lineages = ColumnLineageExtractor.extract(analyzed, columns=["Upper_Comment"])
+        
+        lineage = _single_lineage(lineages)
+        
+        assert lineage.target == ColumnEntity("result", "upper_comment")
+        assert lineage.parents == {_CATALOG_COMMENT}
+    
+    def test_extract_by_target_selected_columns(self, analyzer):
+        """Test that extract_by_target passes the column restriction through."""
+        query = f"CREATE TABLE result AS {_MULTI_COLUMN_SELECT}"
+        
+        analyzed = analyzer.analyze_statement(query)
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed, columns=["TITLE", "price"])
+        
+        assert set(lineage_map) == {"title", "price"}
+        assert lineage_map["title"].parents == {_CATALOG_TITLE}
+        assert lineage_map["price"].parents == {_CATALOG_PRICE}
+    
+    def test_single_column_name_string(self, analyzer):
+        """Test that a bare string is treated as one column name, not its characters."""
+        query = f"CREATE TABLE result AS {_MULTI_COLUMN_SELECT}"
+        
+        analyzed = analyzer.analyze_statement(query)
+        lineage = _single_lineage(ColumnLineageExtractor.extract(analyzed, columns="Price"))
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed, columns="title")
+        
+        assert lineage.target == ColumnEntity("result", "price")
+        assert lineage.parents == {_CATALOG_PRICE}
+        assert set(lineage_map) == {"title"}
 
 
 class TestInsertLineage:
@@ -139,60 +220,79 @@ class TestInsertLineage:
         """
         
         analyzed = analyzer.analyze_statement(query)
-        lineages = ColumnLineageExtractor.extract(analyzed)
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed)
         
-        assert len(lineages) == 2
+        assert len(lineage_map) == 2
         
-        lineage_map = {lineage.target.name: lineage for lineage in lineages}
-        
-        assert ColumnEntity("product_catalog_staging", "title") in lineage_map["title"].parents
-        assert ColumnEntity("product_catalog_staging", "comment") in lineage_map["comment"].parents
+        assert _STAGING_TITLE in lineage_map["title"].parents
+        assert _STAGING_COMMENT in lineage_map["comment"].parents
 
 
-class TestJoinLineage:
-    """Tests for JOIN queries."""
+class TestMergeLineage:
+    """Tests for MERGE statement lineage."""
     
-    def test_simple_join(self, sample_catalog, analyzer, bigquery_language_options):
-        """Test lineage for simple JOIN."""
+    def test_merge_same_target_in_update_and_insert(self, analyzer):
+        """Test that UPDATE and INSERT clauses writing one column are merged by target."""
         query = """
+        MERGE product_catalog AS W
+        USING product_catalog_staging AS S
+        ON W.product_id = S.product_id
+        WHEN MATCHED THEN
+            UPDATE SET title = S.title
+        WHEN NOT MATCHED THEN
+            INSERT (title) VALUES (S.comment)
+        """
+        
+        analyzed = analyzer.analyze_statement(query)
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed)
+        
+        assert len(lineage_map) == 1
+        assert lineage_map["title"].target == ColumnEntity("product_catalog", "title")
+        assert lineage_map["title"].parents == {_STAGING_TITLE, _STAGING_COMMENT}
+
+
+JOIN_CASES = [
+    pytest.param(
+        """
         CREATE TABLE result AS
         SELECT 
             p.title,
             s.quantity
         FROM product_catalog p
         JOIN sales s ON p.product_id = s.product_id
+        """,
+        {
+            ColumnEntity("result", "title"): {_CATALOG_TITLE},
+            ColumnEntity("result", "quantity"): {_SALES_QUANTITY},
+        },
+        id="simple_join",
+    ),
+    pytest.param(
         """
-        
-        analyzed = analyzer.analyze_statement(query)
-        lineages = ColumnLineageExtractor.extract(analyzed)
-        
-        assert len(lineages) == 2
-        
-        lineage_map = {lineage.target.name: lineage for lineage in lineages}
-        
-        assert ColumnEntity("product_catalog", "title") in lineage_map["title"].parents
-        assert ColumnEntity("sales", "quantity") in lineage_map["quantity"].parents
-    
-    def test_join_with_computed_column(self, sample_catalog, analyzer, bigquery_language_options):
-        """Test lineage for JOIN with computed column from multiple tables."""
-        query = """
         CREATE TABLE result AS
         SELECT 
             CONCAT(p.title, s.product_id) AS combined
         FROM product_catalog p
         JOIN sales s ON p.product_id = s.product_id
-        """
-        
+        """,
+        {
+            ColumnEntity("result", "combined"): {_CATALOG_TITLE, _SALES_PRODUCT_ID},
+        },
+        id="join_with_computed_column",
+    ),
+]
+
+
+class TestJoinLineage:
+    """Tests for JOIN queries."""
+    
+    @pytest.mark.parametrize("query,expected", JOIN_CASES)
+    def test_join_lineage(self, analyzer, query, expected):
+        """Test lineage for JOINs, including columns computed from both sides."""
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
-        
-        assert lineage.target == ColumnEntity("result", "combined")
-        assert len(lineage.parents) == 2
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
-        assert ColumnEntity("sales", "product_id") in lineage.parents
+        assert {lineage.target: lineage.parents for lineage in lineages} == expected
 
 
 class TestSubqueryLineage:
@@ -212,13 +312,12 @@ class TestSubqueryLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         # Should trace back to original column
         assert lineage.target == ColumnEntity("result", "upper_title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
 
 
 class TestCTELineage:
@@ -237,12 +336,11 @@ class TestCTELineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
     
     def test_cte_with_transformation(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage with CTE that transforms data."""
@@ -257,13 +355,12 @@ class TestCTELineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         # Should trace through CTE to original column
         assert lineage.target == ColumnEntity("result", "upper_title")
         assert len(lineage.parents) == 1
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
 
 
 class TestAggregateFunctionLineage:
@@ -281,11 +378,10 @@ class TestAggregateFunctionLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "total_quantity")
-        assert ColumnEntity("sales", "quantity") in lineage.parents
+        assert _SALES_QUANTITY in lineage.parents
     
     def test_count_star(self, sample_catalog, analyzer, bigquery_language_options):
         """Test lineage for COUNT(*)."""
@@ -297,12 +393,10 @@ class TestAggregateFunctionLineage:
         """
         
         analyzed = analyzer.analyze_statement(query)
-        lineages = ColumnLineageExtractor.extract(analyzed)
+        lineage_map = ColumnLineageExtractor.extract_by_target(analyzed)
         
         # Should have lineage for product_id and cnt
-        assert len(lineages) >= 1
-        
-        lineage_map = {lineage.target.name: lineage for lineage in lineages}
+        assert len(lineage_map) >= 1
         assert "product_id" in lineage_map
 
 
@@ -324,11 +418,47 @@ class TestCaseExpressionLineage:
         analyzed = analyzer.analyze_statement(query)
         lineages = ColumnLineageExtractor.extract(analyzed)
         
-        assert len(lineages) == 1
-        lineage = list(lineages)[0]
+        lineage = _single_lineage(lineages)
         
         assert lineage.target == ColumnEntity("result", "description")
         # CASE should include columns from THEN and ELSE, but not condition
         # So title and comment, but not price
-        assert ColumnEntity("product_catalog", "title") in lineage.parents
-        assert ColumnEntity("product_catalog", "comment") in lineage.parents
+        assert _CATALOG_TITLE in lineage.parents
+        assert _CATALOG_COMMENT in lineage.parents
+
+
+class TestStructExpansion:
+    """Tests for STRUCT column expansion."""
+    
+    def test_nested_struct_fields_in_declaration_order(self):
+        """Test that nested STRUCT fields expand depth-first in declaration order."""
+        string_type = Type(type_kind=TypeKind.TYPE_STRING)
+        address_type = Type(
+            type_kind=TypeKind.TYPE_STRUCT,
+            struct_type=StructType(field=[
+                StructField("city", string_type),
+                StructField("zip", string_type),
+            ])
+        )
+        user_type = Type(
+            type_kind=TypeKind.TYPE_STRUCT,
+            struct_type=StructType(field=[
+                StructField("name", string_type),
+                StructField("address", address_type),
+                StructField("email", string_type),
+            ])
+        )
+        column = ResolvedColumn(column_id=1, table_name="users", name="user", type=user_type)
+        
+        expanded = expand_struct_column(column)
+        
+        assert [c.name for c in expanded] == [
+            "user",
+            "user.name",
+            "user.address",
+            "user.address.city",
+            "user.address.zip",
+            "user.email",
+        ]
+        assert all(c.column_id == 1 and c.table_name == "users" for c in expanded)
+
@@ -1,6 +1,8 @@
 """Tests for lineage result formatters."""
 
 import json
+from typing import Iterable
+
 import pytest
 
 from zetasql_demo.lineage import (
@@ -11,39 +13,43 @@ from zetasql_demo.lineage import (
 )
 
 
+def _assert_contains_all(text: str, needles: Iterable[str]) -> None:
+    """Assert that every needle occurs in text, reporting all missing ones at once."""
+    missing = [needle for needle in needles if needle not in text]
+    assert not missing, f"missing {missing} in:\n{text}"
+
+
 class TestTableLineageFormatting:
     """Tests for table lineage formatting."""
     
-    def test_table_lineage_to_json(self):
-        """Test table lineage JSON serialization."""
-        lineage = TableLineage(
+    @pytest.fixture(scope="class")
+    def insert_lineage(self) -> TableLineage:
+        """INSERT lineage shared by the tests in this class."""
+        return TableLineage(
             target="project.dataset.target",
-            sources={"project.dataset.source1", "project.dataset.source2"},
+            sources=frozenset({"project.dataset.source1", "project.dataset.source2"}),
             statement_type="INSERT"
         )
-        
-        result = LineageFormatter.to_json(lineage)
-        data = json.loads(result)
+    
+    def test_table_lineage_to_dict(self, insert_lineage: TableLineage):
+        """Test table lineage dict conversion."""
+        data = LineageFormatter.to_dict(insert_lineage)
         
         assert data["target"] == "project.dataset.target"
         assert "project.dataset.source1" in data["sources"]
         assert "project.dataset.source2" in data["sources"]
         assert data["statement_type"] == "INSERT"
     
-    def test_table_lineage_to_text(self):
+    def test_table_lineage_to_text(self, insert_lineage: TableLineage):
         """Test table lineage text formatting."""
-        lineage = TableLineage(
-            target="project.dataset.target",
-            sources={"project.dataset.source1", "project.dataset.source2"},
-            statement_type="INSERT"
-        )
-        
-        result = LineageFormatter.to_text(lineage)
-        
-        assert "INSERT" in result
-        assert "project.dataset.target" in result
-        assert "project.dataset.source1" in result
-        assert "project.dataset.source2" in result
+        result = LineageFormatter.to_text(insert_lineage)
+        
+        _assert_contains_all(result, [
+            "INSERT",
+            "project.dataset.target",
+            "project.dataset.source1",
+            "project.dataset.source2",
+        ])
     
     def test_table_lineage_select_no_target(self):
         """Test SELECT statement with no target."""
@@ -54,8 +60,7 @@ class TestTableLineageFormatting:
         )
         
         text = LineageFormatter.to_text(lineage)
-        json_str = LineageFormatter.to_json(lineage)
-        data = json.loads(json_str)
+        data = LineageFormatter.to_dict(lineage)
         
         assert "SELECT" in text
         assert data["target"] is None
@@ -65,38 +70,35 @@ class TestTableLineageFormatting:
 class TestColumnLineageFormatting:
     """Tests for column lineage formatting."""
     
-    def test_column_lineage_to_json(self):
-        """Test column lineage JSON serialization."""
+    @pytest.fixture(scope="class")
+    def result_col_lineage(self) -> ColumnLineage:
+        """Two-parent column lineage shared by the tests in this class."""
         target = ColumnEntity("target_table", "result_col")
         parents = {
             ColumnEntity("source1", "col1"),
             ColumnEntity("source2", "col2"),
         }
-        lineage = ColumnLineage(target, parents)
-        
-        result = LineageFormatter.to_json([lineage])
-        data = json.loads(result)
+        return ColumnLineage(target, parents)
+    
+    def test_column_lineage_to_dict(self, result_col_lineage: ColumnLineage):
+        """Test column lineage dict conversion."""
+        data = LineageFormatter.to_dict([result_col_lineage])
         
         assert len(data) == 1
         assert data[0]["target"]["table"] == "target_table"
         assert data[0]["target"]["column"] == "result_col"
         assert len(data[0]["parents"]) == 2
     
-    def test_column_lineage_to_text(self):
+    def test_column_lineage_to_text(self, result_col_lineage: ColumnLineage):
         """Test column lineage text formatting."""
-        target = ColumnEntity("target_table", "result_col")
-        parents = {
-            ColumnEntity("source1", "col1"),
-            ColumnEntity("source2", "col2"),
-        }
-        lineage = ColumnLineage(target, parents)
-        
-        result = LineageFormatter.to_text([lineage])
-        
-        assert "target_table.result_col" in result
-        assert "source1.col1" in result
-        assert "source2.col2" in result
-        assert "<-" in result
+        result = LineageFormatter.to_text([result_col_lineage])
+        
+        _assert_contains_all(result, [
+            "target_table.result_col",
+            "source1.col1",
+            "source2.col2",
+            "<-",
+        ])
     
     def test_column_lineage_no_parents(self):
         """Test column with no parents (literal or constant)."""
@@ -123,11 +125,40 @@ class TestColumnLineageFormatting:
         
         result = LineageFormatter.to_text(lineages)
         
-        assert "target.col1" in result
-        assert "target.col2" in result
-        assert "source1.a" in result
-        assert "source2.b" in result
-        assert "source2.c" in result
+        _assert_contains_all(result, [
+            "target.col1",
+            "target.col2",
+            "source1.a",
+            "source2.b",
+            "source2.c",
+        ])
+
+
+class TestJsonSerialization:
+    """Tests for the JSON output shape."""
+    
+    @pytest.mark.parametrize("lineage", [
+        pytest.param(
+            TableLineage(
+                target="project.dataset.target",
+                sources={"project.dataset.source1", "project.dataset.source2"},
+                statement_type="INSERT"
+            ),
+            id="table",
+        ),
+        pytest.param(
+            [
+                ColumnLineage(
+                    ColumnEntity("target", "col1"),
+                    {ColumnEntity("source1", "a"), ColumnEntity("source2", "b")}
+                ),
+            ],
+            id="columns",
+        ),
+    ])
+    def test_json_is_valid_and_matches_dict(self, lineage):
+        """Test to_json() serializes exactly the to_dict() structure."""
+        assert json.loads(LineageFormatter.to_json(lineage)) == LineageFormatter.to_dict(lineage)
 
 
 class TestEmptyLineage:
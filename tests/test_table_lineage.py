@@ -1,298 +1,270 @@
 """Tests for table-level lineage extraction."""
 
+import textwrap
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
 import pytest
-from zetasql.api import Analyzer
 
 from zetasql_demo.lineage import extract_table_lineage, TableLineage
+from zetasql_demo.lineage.table_lineage import TableLineageExtractor
 
 
-class TestSelectStatements:
-    """Tests for SELECT statement lineage."""
-    
-    def test_select_single_table(self, analyzer: Analyzer):
-        """Test SELECT from single table."""
-        sql = "SELECT * FROM `project1.dataset1.orders`"
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "SELECT"
-        assert lineage.target is None  # SELECT has no target
-        assert "project1.dataset1.orders" in lineage.sources
-        assert len(lineage.sources) == 1
-    
-    def test_select_join(self, analyzer: Analyzer):
-        """Test SELECT with JOIN."""
-        sql = """
-        SELECT o.order_id, c.name
-        FROM `project1.dataset1.orders` o
-        JOIN `project1.dataset1.customers` c
-        ON o.customer_id = c.customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "SELECT"
-        assert lineage.target is None
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.customers" in lineage.sources
-        assert len(lineage.sources) == 2
-    
-    def test_select_subquery(self, analyzer: Analyzer):
-        """Test SELECT with subquery."""
-        sql = """
+ORDERS = "project1.dataset1.orders"
+CUSTOMERS = "project1.dataset1.customers"
+ORDER_ITEMS = "project1.dataset1.order_items"
+ORDER_SUMMARY = "project1.dataset1.order_summary"
+CUSTOMER_ORDERS = "project1.dataset1.customer_orders"
+CUSTOMER_ANALYSIS = "project1.dataset1.customer_analysis"
+
+EXPECT_ORDERS = frozenset({ORDERS})
+EXPECT_ORDERS_CUSTOMERS = frozenset({ORDERS, CUSTOMERS})
+EXPECT_ORDERS_ORDER_ITEMS = frozenset({ORDERS, ORDER_ITEMS})
+EXPECT_ORDER_ITEMS = frozenset({ORDER_ITEMS})
+EXPECT_ALL_SOURCES = frozenset({ORDERS, ORDER_ITEMS, CUSTOMERS})
+
+# SQL under test, dedented once at import
+SQL_SELECT_SINGLE_TABLE = "SELECT * FROM `project1.dataset1.orders`"
+
+SQL_SELECT_JOIN = textwrap.dedent("""
+    SELECT o.order_id, c.name
+    FROM `project1.dataset1.orders` o
+    JOIN `project1.dataset1.customers` c
+    ON o.customer_id = c.customer_id
+""").strip()
+
+SQL_SELECT_SUBQUERY = textwrap.dedent("""
+    SELECT * FROM (
+        SELECT order_id, amount
+        FROM `project1.dataset1.orders`
+        WHERE amount > 100
+    ) AS subquery
+""").strip()
+
+SQL_SELECT_CTE = textwrap.dedent("""
+    WITH order_summary AS (
+        SELECT customer_id, SUM(amount) as total
+        FROM `project1.dataset1.orders`
+        GROUP BY customer_id
+    )
+    SELECT c.name, os.total
+    FROM order_summary os
+    JOIN `project1.dataset1.customers` c
+    ON os.customer_id = c.customer_id
+""").strip()
+
+SQL_SELECT_UNION = textwrap.dedent("""
+    SELECT order_id FROM `project1.dataset1.orders`
+    UNION ALL
+    SELECT order_id FROM `project1.dataset1.order_items`
+""").strip()
+
+SQL_CREATE_TABLE_AS_SELECT = textwrap.dedent("""
+    CREATE TABLE `project1.dataset1.order_summary` AS
+    SELECT customer_id, SUM(amount) as total_amount
+    FROM `project1.dataset1.orders`
+    GROUP BY customer_id
+""").strip()
+
+SQL_CREATE_VIEW = textwrap.dedent("""
+    CREATE VIEW `project1.dataset1.customer_orders` AS
+    SELECT c.customer_id, c.name, o.order_id, o.amount
+    FROM `project1.dataset1.customers` c
+    JOIN `project1.dataset1.orders` o
+    ON c.customer_id = o.customer_id
+""").strip()
+
+SQL_UPDATE = textwrap.dedent("""
+    UPDATE `project1.dataset1.orders` o
+    SET amount = amount * 1.1
+    WHERE customer_id IN (
+        SELECT customer_id FROM `project1.dataset1.customers`
+        WHERE region = 'US'
+    )
+""").strip()
+
+SQL_UPDATE_WITH_FROM = textwrap.dedent("""
+    UPDATE `project1.dataset1.orders` o
+    SET amount = oi.price
+    FROM `project1.dataset1.order_items` oi
+    WHERE o.order_id = oi.order_id
+""").strip()
+
+SQL_MERGE = textwrap.dedent("""
+    MERGE `project1.dataset1.orders` target
+    USING `project1.dataset1.order_items` source
+    ON target.order_id = source.order_id
+    WHEN MATCHED THEN
+        UPDATE SET amount = source.price * source.quantity
+    WHEN NOT MATCHED THEN
+        INSERT (order_id, amount) VALUES (source.order_id, source.price)
+""").strip()
+
+SQL_INSERT = textwrap.dedent("""
+    INSERT INTO `project1.dataset1.orders` (order_id, customer_id, amount, order_date)
+    SELECT order_id, order_id as customer_id, price, CURRENT_DATE()
+    FROM `project1.dataset1.order_items`
+""").strip()
+
+SQL_INSERT_FROM_TARGET = textwrap.dedent("""
+    INSERT INTO `project1.dataset1.orders` (order_id, customer_id, amount, order_date)
+    SELECT oi.order_id, o.customer_id, oi.price, o.order_date
+    FROM `project1.dataset1.order_items` oi
+    JOIN `project1.dataset1.orders` o
+    ON oi.order_id = o.order_id
+""").strip()
+
+SQL_NESTED_SUBQUERIES = textwrap.dedent("""
+    SELECT * FROM (
         SELECT * FROM (
-            SELECT order_id, amount
-            FROM `project1.dataset1.orders`
-            WHERE amount > 100
-        ) AS subquery
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "SELECT"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert len(lineage.sources) == 1
-    
-    def test_select_cte(self, analyzer: Analyzer):
-        """Test SELECT with CTE (WITH clause)."""
-        sql = """
-        WITH order_summary AS (
             SELECT customer_id, SUM(amount) as total
             FROM `project1.dataset1.orders`
             GROUP BY customer_id
-        )
-        SELECT c.name, os.total
-        FROM order_summary os
-        JOIN `project1.dataset1.customers` c
-        ON os.customer_id = c.customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "SELECT"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.customers" in lineage.sources
-        assert len(lineage.sources) == 2
-    
-    def test_select_union(self, analyzer: Analyzer):
-        """Test SELECT with UNION."""
-        sql = """
-        SELECT order_id FROM `project1.dataset1.orders`
-        UNION ALL
-        SELECT order_id FROM `project1.dataset1.order_items`
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "SELECT"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.order_items" in lineage.sources
-        assert len(lineage.sources) == 2
-
+        ) AS inner_query
+        WHERE total > 1000
+    ) AS outer_query
+""").strip()
 
-class TestCreateStatements:
-    """Tests for CREATE statement lineage."""
-    
-    def test_create_table_as_select(self, analyzer: Analyzer):
-        """Test CREATE TABLE AS SELECT."""
-        sql = """
-        CREATE TABLE `project1.dataset1.order_summary` AS
-        SELECT customer_id, SUM(amount) as total_amount
+SQL_MULTIPLE_CTES = textwrap.dedent("""
+    WITH order_totals AS (
+        SELECT customer_id, SUM(amount) as total
         FROM `project1.dataset1.orders`
         GROUP BY customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "CREATE_TABLE_AS_SELECT"
-        assert lineage.target == "project1.dataset1.order_summary"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert len(lineage.sources) == 1
-    
-    def test_create_view(self, analyzer: Analyzer):
-        """Test CREATE VIEW."""
-        sql = """
-        CREATE VIEW `project1.dataset1.customer_orders` AS
-        SELECT c.customer_id, c.name, o.order_id, o.amount
-        FROM `project1.dataset1.customers` c
-        JOIN `project1.dataset1.orders` o
-        ON c.customer_id = o.customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "CREATE_VIEW"
-        assert lineage.target == "project1.dataset1.customer_orders"
-        assert "project1.dataset1.customers" in lineage.sources
-        assert "project1.dataset1.orders" in lineage.sources
-        assert len(lineage.sources) == 2
+    ),
+    customer_info AS (
+        SELECT customer_id, name, region
+        FROM `project1.dataset1.customers`
+    )
+    SELECT ci.name, ci.region, ot.total
+    FROM customer_info ci
+    JOIN order_totals ot ON ci.customer_id = ot.customer_id
+""").strip()
 
+SQL_CREATE_TABLE_WITH_COMPLEX_QUERY = textwrap.dedent("""
+    CREATE TABLE `project1.dataset1.customer_analysis` AS
+    WITH order_stats AS (
+        SELECT 
+            o.customer_id,
+            COUNT(*) as order_count,
+            SUM(o.amount) as total_amount
+        FROM `project1.dataset1.orders` o
+        JOIN `project1.dataset1.order_items` oi
+        ON o.order_id = oi.order_id
+        GROUP BY o.customer_id
+    )
+    SELECT 
+        c.customer_id,
+        c.name,
+        c.region,
+        os.order_count,
+        os.total_amount
+    FROM `project1.dataset1.customers` c
+    LEFT JOIN order_stats os ON c.customer_id = os.customer_id
+""").strip()
 
-class TestDMLStatements:
-    """Tests for DML statement lineage."""
-    
-    def test_insert(self, analyzer: Analyzer):
-        """Test INSERT statement."""
-        sql = """
-        INSERT INTO `project1.dataset1.orders` (order_id, customer_id, amount, order_date)
-        SELECT order_id, order_id as customer_id, price, CURRENT_DATE()
-        FROM `project1.dataset1.order_items`
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "INSERT"
-        assert lineage.target == "project1.dataset1.orders"
-        assert "project1.dataset1.order_items" in lineage.sources
-        # Note: target table may also appear in sources depending on analysis
-        assert len(lineage.sources) >= 1
+
+@dataclass(frozen=True)
+class Case:
+    """A statement and the table lineage expected from it."""
+    id: str
+    sql: str
+    statement_type: str
+    target: Optional[str]  # None for SELECT, which has no target
+    sources: FrozenSet[str]
     
-    def test_update(self, analyzer: Analyzer):
-        """Test UPDATE statement."""
-        sql = """
-        UPDATE `project1.dataset1.orders` o
-        SET amount = amount * 1.1
-        WHERE customer_id IN (
-            SELECT customer_id FROM `project1.dataset1.customers`
-            WHERE region = 'US'
+    @property
+    def expected(self) -> TableLineage:
+        """The TableLineage extract_table_lineage() should return."""
+        return TableLineage(
+            target=self.target,
+            sources=self.sources,
+            statement_type=self.statement_type
         )
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
-        
-        assert lineage.statement_type == "UPDATE"
-        assert lineage.target == "project1.dataset1.orders"
-        assert "project1.dataset1.orders" in lineage.sources  # Self-reference
-        assert "project1.dataset1.customers" in lineage.sources
-        assert len(lineage.sources) == 2
+
+
+CASES = [
+    # SELECT statements
+    Case("select_single_table", SQL_SELECT_SINGLE_TABLE, "SELECT", None, EXPECT_ORDERS),
+    Case("select_join", SQL_SELECT_JOIN, "SELECT", None, EXPECT_ORDERS_CUSTOMERS),
+    Case("select_subquery", SQL_SELECT_SUBQUERY, "SELECT", None, EXPECT_ORDERS),
+    Case("select_cte", SQL_SELECT_CTE, "SELECT", None, EXPECT_ORDERS_CUSTOMERS),
+    Case("select_union", SQL_SELECT_UNION, "SELECT", None, EXPECT_ORDERS_ORDER_ITEMS),
+    # CREATE statements
+    Case(
+        "create_table_as_select", SQL_CREATE_TABLE_AS_SELECT,
+        "CREATE_TABLE_AS_SELECT", ORDER_SUMMARY, EXPECT_ORDERS,
+    ),
+    Case(
+        "create_view", SQL_CREATE_VIEW,
+        "CREATE_VIEW", CUSTOMER_ORDERS, EXPECT_ORDERS_CUSTOMERS,
+    ),
+    # UPDATE and MERGE read their target, so it is also a source
+    Case("update", SQL_UPDATE, "UPDATE", ORDERS, EXPECT_ORDERS_CUSTOMERS),
+    Case(
+        "update_with_from", SQL_UPDATE_WITH_FROM,
+        "UPDATE", ORDERS, EXPECT_ORDERS_ORDER_ITEMS,
+    ),
+    Case("merge", SQL_MERGE, "MERGE", ORDERS, EXPECT_ORDERS_ORDER_ITEMS),
+    # Complex queries
+    Case("nested_subqueries", SQL_NESTED_SUBQUERIES, "SELECT", None, EXPECT_ORDERS),
+    Case("multiple_ctes", SQL_MULTIPLE_CTES, "SELECT", None, EXPECT_ORDERS_CUSTOMERS),
+    Case(
+        "create_table_with_complex_query", SQL_CREATE_TABLE_WITH_COMPLEX_QUERY,
+        "CREATE_TABLE_AS_SELECT", CUSTOMER_ANALYSIS, EXPECT_ALL_SOURCES,
+    ),
+]
+
+
+class TestTableLineage:
+    """Tests for table lineage across statement types."""
     
-    def test_update_with_from(self, analyzer: Analyzer):
-        """Test UPDATE with FROM clause."""
-        sql = """
-        UPDATE `project1.dataset1.orders` o
-        SET amount = oi.price
-        FROM `project1.dataset1.order_items` oi
-        WHERE o.order_id = oi.order_id
-        """
-        stmt = analyzer.analyze_statement(sql)
+    @pytest.mark.parametrize("case", CASES, ids=lambda case: case.id)
+    def test_table_lineage(self, analyzer, case: Case):
+        """Test statement type, target and source tables."""
+        stmt = analyzer.analyze_statement(case.sql)
         
         lineage = extract_table_lineage(stmt)
         
-        assert lineage.statement_type == "UPDATE"
-        assert lineage.target == "project1.dataset1.orders"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.order_items" in lineage.sources
-        assert len(lineage.sources) == 2
+        assert lineage == case.expected
     
-    def test_merge(self, analyzer: Analyzer):
-        """Test MERGE statement."""
-        sql = """
-        MERGE `project1.dataset1.orders` target
-        USING `project1.dataset1.order_items` source
-        ON target.order_id = source.order_id
-        WHEN MATCHED THEN
-            UPDATE SET amount = source.price * source.quantity
-        WHEN NOT MATCHED THEN
-            INSERT (order_id, amount) VALUES (source.order_id, source.price)
-        """
-        stmt = analyzer.analyze_statement(sql)
+    def test_insert(self, analyzer):
+        """Test INSERT statement reports only the tables it reads."""
+        stmt = analyzer.analyze_statement(SQL_INSERT)
         
         lineage = extract_table_lineage(stmt)
         
-        assert lineage.statement_type == "MERGE"
-        assert lineage.target == "project1.dataset1.orders"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.order_items" in lineage.sources
-        assert len(lineage.sources) == 2
-
-
-class TestComplexQueries:
-    """Tests for complex query lineage."""
+        assert lineage.statement_type == "INSERT"
+        assert lineage.target == ORDERS
+        assert lineage.sources == EXPECT_ORDER_ITEMS
     
-    def test_nested_subqueries(self, analyzer: Analyzer):
-        """Test deeply nested subqueries."""
-        sql = """
-        SELECT * FROM (
-            SELECT * FROM (
-                SELECT customer_id, SUM(amount) as total
-                FROM `project1.dataset1.orders`
-                GROUP BY customer_id
-            ) AS inner_query
-            WHERE total > 1000
-        ) AS outer_query
-        """
-        stmt = analyzer.analyze_statement(sql)
+    def test_insert_reading_target(self, analyzer):
+        """Test INSERT that also reads its target keeps it as a source."""
+        stmt = analyzer.analyze_statement(SQL_INSERT_FROM_TARGET)
         
         lineage = extract_table_lineage(stmt)
         
-        assert lineage.statement_type == "SELECT"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert len(lineage.sources) == 1
+        assert lineage.target == ORDERS
+        assert lineage.sources == EXPECT_ORDERS_ORDER_ITEMS
     
-    def test_multiple_ctes(self, analyzer: Analyzer):
-        """Test multiple CTEs."""
-        sql = """
-        WITH order_totals AS (
-            SELECT customer_id, SUM(amount) as total
-            FROM `project1.dataset1.orders`
-            GROUP BY customer_id
-        ),
-        customer_info AS (
-            SELECT customer_id, name, region
-            FROM `project1.dataset1.customers`
-        )
-        SELECT ci.name, ci.region, ot.total
-        FROM customer_info ci
-        JOIN order_totals ot ON ci.customer_id = ot.customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
+    def test_subclass_handler_calling_descend(self, analyzer):
+        """Test a subclass handler that calls descend() does not re-walk subtrees."""
         
-        lineage = extract_table_lineage(stmt)
+        class CountingExtractor(TableLineageExtractor):
+            __slots__ = ("scan_visits",)
+            
+            def __init__(self):
+                super().__init__()
+                self.scan_visits = 0
+            
+            def visit_ResolvedProjectScan(self, node):
+                self.descend(node)
+            
+            def visit_ResolvedTableScan(self, node):
+                self.scan_visits += 1
+                super().visit_ResolvedTableScan(node)
         
-        assert lineage.statement_type == "SELECT"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.customers" in lineage.sources
-        assert len(lineage.sources) == 2
-    
-    def test_create_table_with_complex_query(self, analyzer: Analyzer):
-        """Test CREATE TABLE AS with complex query."""
-        sql = """
-        CREATE TABLE `project1.dataset1.customer_analysis` AS
-        WITH order_stats AS (
-            SELECT 
-                o.customer_id,
-                COUNT(*) as order_count,
-                SUM(o.amount) as total_amount
-            FROM `project1.dataset1.orders` o
-            JOIN `project1.dataset1.order_items` oi
-            ON o.order_id = oi.order_id
-            GROUP BY o.customer_id
-        )
-        SELECT 
-            c.customer_id,
-            c.name,
-            c.region,
-            os.order_count,
-            os.total_amount
-        FROM `project1.dataset1.customers` c
-        LEFT JOIN order_stats os ON c.customer_id = os.customer_id
-        """
-        stmt = analyzer.analyze_statement(sql)
-        
-        lineage = extract_table_lineage(stmt)
+        extractor = CountingExtractor()
+        extractor.visit(analyzer.analyze_statement(SQL_SELECT_SUBQUERY))
         
-        assert lineage.statement_type == "CREATE_TABLE_AS_SELECT"
-        assert lineage.target == "project1.dataset1.customer_analysis"
-        assert "project1.dataset1.orders" in lineage.sources
-        assert "project1.dataset1.order_items" in lineage.sources
-        assert "project1.dataset1.customers" in lineage.sources
-        assert len(lineage.sources) == 3
+        assert extractor.scan_visits == 1
+        assert extractor.get_lineage().sources == EXPECT_ORDERS
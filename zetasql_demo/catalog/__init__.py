@@ -1,5 +1,6 @@
 """Catalog creation utilities for ZetaSQL demos."""
 
 from .sample_catalog import create_sample_catalog
+from .registered_analyzer import RegisteredCatalogAnalyzer
 
-__all__ = ["create_sample_catalog"]
+__all__ = ["create_sample_catalog", "RegisteredCatalogAnalyzer"]
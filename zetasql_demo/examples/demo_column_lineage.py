@@ -6,6 +6,7 @@ Python port of ExtractColumnLevelLineage.java from zetasql-toolkit.
 
 import os
 import sys
+from operator import attrgetter
 
 # Ensure the project `src` directory is on sys.path so `zetasql_demo` imports work
 # This allows running the example directly (e.g. `python zetasql_demo/examples/demo_column_lineage.py`).
@@ -22,24 +23,31 @@ from zetasql_demo.lineage import ColumnLineageExtractor
 from zetasql_demo.options import get_bigquery_language_options
 
 
+# Sort keys for printing lineages by target column, and parents by column
+_lineage_sort_key = attrgetter("target.table", "target.name")
+_parent_sort_key = attrgetter("table", "name")
+
+
 def output_lineage(query: str, lineage_entries: set) -> None:
     """Print query and its column lineage.
     
+    The output is assembled first and written with a single print().
+    
     Args:
         query: SQL query string
         lineage_entries: Set of ColumnLineage objects
     """
-    print("\nQuery:")
-    print(query)
-    print("\nLineage:")
+    lines = ["", "Query:", query, "", "Lineage:"]
+    append = lines.append
     
-    for lineage in sorted(lineage_entries, key=lambda x: (x.target.table, x.target.name)):
-        print(f"{lineage.target.table}.{lineage.target.name}")
-        for parent in sorted(lineage.parents, key=lambda x: (x.table, x.name)):
-            print(f"\t\t<- {parent.table}.{parent.name}")
+    for lineage in sorted(lineage_entries, key=_lineage_sort_key):
+        target = lineage.target
+        append(f"{target.table}.{target.name}")
+        for parent in sorted(lineage.parents, key=_parent_sort_key):
+            append(f"\t\t<- {parent.table}.{parent.name}")
     
-    print()
-    print()
+    lines.extend(["", ""])
+    print("\n".join(lines))
 
 
 def demo_create_table_as_select(analyzer: Analyzer) -> None:
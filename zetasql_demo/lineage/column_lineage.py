@@ -7,7 +7,7 @@ Port of Java classes from zetasql-toolkit:
 """
 
 from collections import deque
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 
 from zetasql.api import ResolvedNodeVisitor
 from zetasql.types import ResolvedColumn, ResolvedExpr, ResolvedStatement
@@ -28,9 +28,11 @@ def make_column_key(column: ResolvedColumn) -> str:
 
 
 def expand_struct_column(column: ResolvedColumn) -> List[ResolvedColumn]:
-    """Recursively expand STRUCT columns into their fields.
+    """Expand STRUCT columns into their fields, including nested STRUCTs.
     
-    Port of ParentColumnFinder.expandColumn() from Java.
+    Port of ParentColumnFinder.expandColumn() from Java. Uses an explicit
+    stack instead of recursion; fields are returned depth-first in
+    declaration order, as the recursive Java version does.
     
     Args:
         column: ResolvedColumn to expand
@@ -44,21 +46,28 @@ def expand_struct_column(column: ResolvedColumn) -> List[ResolvedColumn]:
         >>> # Returns: [user_struct, user_struct.name, user_struct.address, 
         >>> #           user_struct.address.city]
     """
-    result = [column]
-    
-    column_type = column.type
-    if column_type.is_struct():
-        struct_type = column_type.as_struct()
-        if struct_type is not None:
-            for field in struct_type.field:
-                field_column = ResolvedColumn(
-                    column_id=column.column_id,
-                    table_name=column.table_name,
-                    name=f"{column.name}.{field.field_name}",
-                    type_=field.field_type
-                )
-                # Recursively expand nested STRUCTs
-                result.extend(expand_struct_column(field_column))
+    result = []
+    stack = [column]
+    
+    while stack:
+        current = stack.pop()
+        result.append(current)
+        
+        column_type = current.type
+        if column_type.is_struct():
+            struct_type = column_type.as_struct()
+            if struct_type is not None:
+                field_columns = [
+                    ResolvedColumn(
+                        column_id=current.column_id,
+                        table_name=current.table_name,
+                        name=f"{current.name}.{field.field_name}",
+                        type=field.field_type
+                    )
+                    for field in struct_type.field
+                ]
+                # Push in reverse so nested STRUCTs expand in declaration order
+                stack.extend(reversed(field_columns))
     
     return result
 
@@ -289,6 +298,23 @@ class ParentColumnFinder(ResolvedNodeVisitor):
         self.with_entry_scopes: List[List] = []  # Stack of WITH entries
         self.columns_being_computed: List[ResolvedColumn] = []  # Stack
     
+    @staticmethod
+    def for_statement(statement: ResolvedStatement) -> "ParentColumnFinder":
+        """Build a finder with the column parent map of a statement.
+        
+        The statement is traversed once; the returned finder can then
+        resolve any number of columns or expressions of that statement.
+        
+        Args:
+            statement: ResolvedStatement to traverse
+        
+        Returns:
+            ParentColumnFinder populated for the statement
+        """
+        finder = ParentColumnFinder()
+        finder.visit(statement)
+        return finder
+    
     @staticmethod
     def find_parents_for_column(
         statement: ResolvedStatement, 
@@ -320,14 +346,51 @@ class ParentColumnFinder(ResolvedNodeVisitor):
         Returns:
             List of terminal parent ResolvedColumns
         """
+        finder = ParentColumnFinder.for_statement(statement)
+        return finder.terminal_parents_of_expression(expression)
+    
+    def terminal_parents_of_column(self, column: ResolvedColumn) -> List[ResolvedColumn]:
+        """BFS from a column to its terminal parents using the populated map.
+        
+        Args:
+            column: Column to find parents for
+        
+        Returns:
+            List of terminal parent columns
+        """
+        result = []
+        resolution_queue = deque([column])
+        
+        while resolution_queue:
+            current_column = resolution_queue.popleft()
+            current_key = make_column_key(current_column)
+            parents = self._get_parents_of_column(current_column)
+            
+            if not parents and current_key in self.terminal_columns:
+                # Terminal column found
+                result.append(current_column)
+            else:
+                # Continue traversal
+                resolution_queue.extend(parents)
+        
+        return result
+    
+    def terminal_parents_of_expression(self, expression: ResolvedExpr) -> List[ResolvedColumn]:
+        """Find terminal parents of every column an expression references.
+        
+        Args:
+            expression: ResolvedExpr to find parents for
+        
+        Returns:
+            List of terminal parent columns
+        """
         # Find direct parents of the expression
         parents_referenced = ExpressionParentFinder.find_direct_parents(expression)
         
         # Find terminal parents of each direct parent
         result = []
         for parent in parents_referenced:
-            terminal_parents = ParentColumnFinder.find_parents_for_column(statement, parent)
-            result.extend(terminal_parents)
+            result.extend(self.terminal_parents_of_column(parent))
         
         return result
     
@@ -349,22 +412,7 @@ class ParentColumnFinder(ResolvedNodeVisitor):
         self.visit(container_node)
         
         # Step 2: BFS to find terminal parents
-        result = []
-        resolution_queue = deque([column])
-        
-        while resolution_queue:
-            current_column = resolution_queue.popleft()
-            current_key = make_column_key(current_column)
-            parents = self._get_parents_of_column(current_column)
-            
-            if not parents and current_key in self.terminal_columns:
-                # Terminal column found
-                result.append(current_column)
-            else:
-                # Continue traversal
-                resolution_queue.extend(parents)
-        
-        return result
+        return self.terminal_parents_of_column(column)
     
     def _get_parents_of_column(self, column: ResolvedColumn) -> List[ResolvedColumn]:
         """Get direct parents of a column from the map.
@@ -524,11 +572,12 @@ class ParentColumnFinder(ResolvedNodeVisitor):
         Returns:
             ResolvedWithEntry if found, None otherwise
         """
+        name_ci = name.lower()
         # Traverse scope stack top-to-bottom
         for i in range(len(self.with_entry_scopes) - 1, -1, -1):
             in_scope_entries = self.with_entry_scopes[i]
             for with_entry in in_scope_entries:
-                if with_entry.with_query_name.lower() == name.lower():
+                if with_entry.with_query_name.lower() == name_ci:
                     return with_entry
         return None
     
@@ -621,11 +670,18 @@ class ColumnLineageExtractor:
     """
     
     @staticmethod
-    def extract(statement: ResolvedStatement) -> Set[ColumnLineage]:
+    def extract(
+        statement: ResolvedStatement,
+        columns: Optional[Iterable[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract column lineage from a statement.
         
         Args:
             statement: Analyzed ResolvedStatement
+            columns: Optional target column names to restrict extraction to
+                (case-insensitive). Parents are only resolved for these
+                columns; None extracts every target column. A single str
+                is treated as one column name.
             
         Returns:
             Set of ColumnLineage objects
@@ -640,117 +696,195 @@ class ColumnLineageExtractor:
             ResolvedMergeStmt,
         )
         
+        if columns is None:
+            wanted = None
+        elif isinstance(columns, str):
+            wanted = {columns.lower()}
+        else:
+            wanted = {name.lower() for name in columns}
+        
         if isinstance(statement, ResolvedCreateTableAsSelectStmt):
-            return ColumnLineageExtractor._extract_for_create_table_as_select(statement)
+            return ColumnLineageExtractor._extract_for_create_table_as_select(statement, wanted)
         elif isinstance(statement, ResolvedCreateViewStmt):
-            return ColumnLineageExtractor._extract_for_create_view(statement)
+            return ColumnLineageExtractor._extract_for_create_view(statement, wanted)
         elif isinstance(statement, ResolvedQueryStmt):
-            return ColumnLineageExtractor._extract_for_query_stmt(statement)
+            return ColumnLineageExtractor._extract_for_query_stmt(statement, wanted)
         elif isinstance(statement, ResolvedInsertStmt):
-            return ColumnLineageExtractor._extract_for_insert(statement)
+            return ColumnLineageExtractor._extract_for_insert(statement, wanted)
         elif isinstance(statement, ResolvedUpdateStmt):
-            return ColumnLineageExtractor._extract_for_update(statement)
+            return ColumnLineageExtractor._extract_for_update(statement, wanted)
         elif isinstance(statement, ResolvedMergeStmt):
-            return ColumnLineageExtractor._extract_for_merge(statement)
+            return ColumnLineageExtractor._extract_for_merge(statement, wanted)
         else:
             # Unsupported statement type
             return set()
     
     @staticmethod
-    def _extract_for_create_table_as_select(stmt) -> Set[ColumnLineage]:
+    def extract_by_target(
+        statement: ResolvedStatement,
+        columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, ColumnLineage]:
+        """Extract column lineage indexed by target column name.
+        
+        Keys are lowercased, matching ColumnEntity's case-insensitive
+        column names. Lineages that share a target column (e.g. a MERGE
+        that both updates and inserts it) are merged into one entry.
+        
+        Args:
+            statement: Analyzed ResolvedStatement
+            columns: Optional target column names to restrict extraction to
+                (case-insensitive), or a single name; passed through to
+                extract()
+        
+        Returns:
+            Dict of lowercased target column name -> ColumnLineage
+        """
+        result: Dict[str, ColumnLineage] = {}
+        for lineage in ColumnLineageExtractor.extract(statement, columns):
+            key = lineage.target.name_ci
+            existing = result.get(key)
+            if existing is not None:
+                lineage = ColumnLineage(
+                    target=existing.target,
+                    parents=existing.parents | lineage.parents
+                )
+            result[key] = lineage
+        return result
+    
+    @staticmethod
+    def _is_wanted(column_name: str, wanted: Optional[Set[str]]) -> bool:
+        """Check a target column name against the lowercased column filter.
+        
+        Args:
+            column_name: Target column name
+            wanted: Lowercased column names to keep, or None to keep all
+        
+        Returns:
+            True if lineage should be extracted for the column
+        """
+        return wanted is None or column_name.lower() in wanted
+    
+    @staticmethod
+    def _extract_for_create_table_as_select(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from CREATE TABLE AS SELECT.
         
         Args:
             stmt: ResolvedCreateTableAsSelectStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         target_table = ".".join(stmt.name_path)
         
         for output_column in stmt.output_column_list:
             target_column_name = output_column.name
+            if not ColumnLineageExtractor._is_wanted(target_column_name, wanted):
+                continue
             target_entity = ColumnEntity(target_table, target_column_name)
             
             # Find terminal parents - output_column.column is the actual ResolvedColumn
-            terminal_parents = ParentColumnFinder.find_parents_for_column(stmt, output_column.column)
-            parent_entities = {
+            terminal_parents = finder.terminal_parents_of_column(output_column.column)
+            parent_entities = frozenset(
                 ColumnEntity.from_resolved_column(parent)
                 for parent in terminal_parents
-            }
+            )
             
             result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
         return result
     
     @staticmethod
-    def _extract_for_create_view(stmt) -> Set[ColumnLineage]:
+    def _extract_for_create_view(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from CREATE VIEW.
         
         Args:
             stmt: ResolvedCreateViewStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         target_table = ".".join(stmt.name_path)
         
         for output_column in stmt.output_column_list:
             target_column_name = output_column.name
+            if not ColumnLineageExtractor._is_wanted(target_column_name, wanted):
+                continue
             target_entity = ColumnEntity(target_table, target_column_name)
             
-            terminal_parents = ParentColumnFinder.find_parents_for_column(stmt, output_column.column)
-            parent_entities = {
+            terminal_parents = finder.terminal_parents_of_column(output_column.column)
+            parent_entities = frozenset(
                 ColumnEntity.from_resolved_column(parent)
                 for parent in terminal_parents
-            }
+            )
             
             result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
         return result
     
     @staticmethod
-    def _extract_for_query_stmt(stmt) -> Set[ColumnLineage]:
+    def _extract_for_query_stmt(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from SELECT query statement.
         
         Args:
             stmt: ResolvedQueryStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         # For SELECT, target table is empty string
         target_table = ""
         
         query = stmt.query
         for output_column in query.column_list:
             target_column_name = output_column.name
+            if not ColumnLineageExtractor._is_wanted(target_column_name, wanted):
+                continue
             target_entity = ColumnEntity(target_table, target_column_name)
             
-            terminal_parents = ParentColumnFinder.find_parents_for_column(stmt, output_column)
-            parent_entities = {
+            terminal_parents = finder.terminal_parents_of_column(output_column)
+            parent_entities = frozenset(
                 ColumnEntity.from_resolved_column(parent)
                 for parent in terminal_parents
-            }
+            )
             
             result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
         return result
     
     @staticmethod
-    def _extract_for_insert(stmt) -> Set[ColumnLineage]:
+    def _extract_for_insert(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from INSERT statement.
         
         Args:
             stmt: ResolvedInsertStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         target_table = stmt.table_scan.table.name
         
         # Map insert columns to query columns
@@ -762,29 +896,36 @@ class ColumnLineageExtractor:
             for i in range(len(insert_columns)):
                 insert_column = insert_columns[i]
                 query_column = query_columns[i]
+                if not ColumnLineageExtractor._is_wanted(insert_column.name, wanted):
+                    continue
                 
                 target_entity = ColumnEntity(target_table, insert_column.name)
-                terminal_parents = ParentColumnFinder.find_parents_for_column(stmt, query_column)
-                parent_entities = {
+                terminal_parents = finder.terminal_parents_of_column(query_column)
+                parent_entities = frozenset(
                     ColumnEntity.from_resolved_column(parent)
                     for parent in terminal_parents
-                }
+                )
                 
                 result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
         return result
     
     @staticmethod
-    def _extract_for_update(stmt) -> Set[ColumnLineage]:
+    def _extract_for_update(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from UPDATE statement.
         
         Args:
             stmt: ResolvedUpdateStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         target_table = stmt.table_scan.table.name
         
         # Process UPDATE SET items
@@ -792,34 +933,40 @@ class ColumnLineageExtractor:
             target_column_ref = update_item.target
             # target is a ResolvedColumnRef, get the actual column
             target_column = target_column_ref.column
+            if not ColumnLineageExtractor._is_wanted(target_column.name, wanted):
+                continue
             target_entity = ColumnEntity(target_table, target_column.name)
             
             # Find parents from the SET expression
             if update_item.set_value is not None:
-                terminal_parents = ParentColumnFinder.find_parents_for_expression(
-                    stmt, 
+                terminal_parents = finder.terminal_parents_of_expression(
                     update_item.set_value.value
                 )
-                parent_entities = {
+                parent_entities = frozenset(
                     ColumnEntity.from_resolved_column(parent)
                     for parent in terminal_parents
-                }
+                )
                 
                 result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
         return result
     
     @staticmethod
-    def _extract_for_merge(stmt) -> Set[ColumnLineage]:
+    def _extract_for_merge(
+        stmt,
+        wanted: Optional[Set[str]] = None
+    ) -> Set[ColumnLineage]:
         """Extract lineage from MERGE statement.
         
         Args:
             stmt: ResolvedMergeStmt
+            wanted: Lowercased target column names to keep, or None for all
             
         Returns:
             Set of ColumnLineage objects
         """
         result = set()
+        finder = ParentColumnFinder.for_statement(stmt)
         target_table = stmt.table_scan.table.name
         
         # Process WHEN clauses
@@ -831,17 +978,18 @@ class ColumnLineageExtractor:
                         target_column_ref = update_item.target
                         # target is a ResolvedColumnRef, get the actual column
                         target_column = target_column_ref.column
+                        if not ColumnLineageExtractor._is_wanted(target_column.name, wanted):
+                            continue
                         target_entity = ColumnEntity(target_table, target_column.name)
                         
                         if update_item.set_value is not None:
-                            terminal_parents = ParentColumnFinder.find_parents_for_expression(
-                                stmt,
+                            terminal_parents = finder.terminal_parents_of_expression(
                                 update_item.set_value.value
                             )
-                            parent_entities = {
+                            parent_entities = frozenset(
                                 ColumnEntity.from_resolved_column(parent)
                                 for parent in terminal_parents
-                            }
+                            )
                             
                             result.add(ColumnLineage(target=target_entity, parents=parent_entities))
             
@@ -853,18 +1001,19 @@ class ColumnLineageExtractor:
                     insert_row = when_clause.insert_row
                     
                     for i, insert_column in enumerate(insert_columns):
+                        if not ColumnLineageExtractor._is_wanted(insert_column.name, wanted):
+                            continue
                         target_entity = ColumnEntity(target_table, insert_column.name)
                         
                         if i < len(insert_row.value_list):
                             value_expr = insert_row.value_list[i]
-                            terminal_parents = ParentColumnFinder.find_parents_for_expression(
-                                stmt,
+                            terminal_parents = finder.terminal_parents_of_expression(
                                 value_expr
                             )
-                            parent_entities = {
+                            parent_entities = frozenset(
                                 ColumnEntity.from_resolved_column(parent)
                                 for parent in terminal_parents
-                            }
+                            )
                             
                             result.add(ColumnLineage(target=target_entity, parents=parent_entities))
         
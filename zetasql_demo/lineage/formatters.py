@@ -6,11 +6,20 @@ Provides JSON and human-readable text formatting for:
 """
 
 import json
-from typing import List, Union
+from operator import attrgetter
+from typing import Any, Dict, List, Union
 
 from .models import ColumnEntity, ColumnLineage, TableLineage
 
 
+# Sort key for parent columns in formatted output
+_parent_sort_key = attrgetter("table", "name")
+
+# Output for an empty list of column lineages
+_EMPTY_COLUMN_LINEAGE_JSON = "[]"
+_EMPTY_COLUMN_LINEAGE_TEXT = "(no column lineage)"
+
+
 class LineageFormatter:
     """Formatter for lineage results to JSON and text."""
     
@@ -35,12 +44,33 @@ class LineageFormatter:
               "statement_type": "INSERT"
             }
         """
+        if isinstance(lineage, list) and not lineage:
+            return _EMPTY_COLUMN_LINEAGE_JSON
+        return json.dumps(LineageFormatter.to_dict(lineage), indent=2)
+    
+    @staticmethod
+    def to_dict(
+        lineage: Union[TableLineage, ColumnLineage, List[ColumnLineage]]
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Convert lineage to the plain structure serialized by to_json().
+        
+        Args:
+            lineage: TableLineage, ColumnLineage, or list of ColumnLineage
+        
+        Returns:
+            Dict for a TableLineage, list of dicts for column lineage
+        
+        Example:
+            >>> lineage = TableLineage(target="t1", sources={"t2"}, statement_type="INSERT")
+            >>> LineageFormatter.to_dict(lineage)
+            {'target': 't1', 'sources': ['t2'], 'statement_type': 'INSERT'}
+        """
         if isinstance(lineage, TableLineage):
-            return LineageFormatter._table_lineage_to_json(lineage)
+            return LineageFormatter._table_lineage_to_dict(lineage)
         elif isinstance(lineage, list):
-            return LineageFormatter._column_lineages_to_json(lineage)
+            return LineageFormatter._column_lineages_to_dict(lineage)
         elif isinstance(lineage, ColumnLineage):
-            return LineageFormatter._column_lineages_to_json([lineage])
+            return LineageFormatter._column_lineages_to_dict([lineage])
         else:
             raise TypeError(f"Unsupported lineage type: {type(lineage)}")
     
@@ -74,14 +104,13 @@ class LineageFormatter:
             raise TypeError(f"Unsupported lineage type: {type(lineage)}")
     
     @staticmethod
-    def _table_lineage_to_json(lineage: TableLineage) -> str:
-        """Convert TableLineage to JSON."""
-        data = {
+    def _table_lineage_to_dict(lineage: TableLineage) -> Dict[str, Any]:
+        """Convert TableLineage to a JSON-ready dict."""
+        return {
             "target": lineage.target,
-            "sources": sorted(list(lineage.sources)),
+            "sources": sorted(lineage.sources),
             "statement_type": lineage.statement_type,
         }
-        return json.dumps(data, indent=2)
     
     @staticmethod
     def _table_lineage_to_text(lineage: TableLineage) -> str:
@@ -97,29 +126,30 @@ class LineageFormatter:
         
         lines.append("Sources:")
         if lineage.sources:
-            for source in sorted(lineage.sources):
-                lines.append(f"  - {source}")
+            lines += [f"  - {source}" for source in sorted(lineage.sources)]
         else:
             lines.append("  (no sources)")
         
         return "\n".join(lines)
     
     @staticmethod
-    def _column_lineages_to_json(lineages: List[ColumnLineage]) -> str:
-        """Convert list of ColumnLineage to JSON."""
-        data = []
-        for lineage in lineages:
-            data.append({
+    def _column_lineages_to_dict(
+        lineages: List[ColumnLineage]
+    ) -> List[Dict[str, Any]]:
+        """Convert list of ColumnLineage to a JSON-ready list of dicts."""
+        return [
+            {
                 "target": {
                     "table": lineage.target.table,
                     "column": lineage.target.name,
                 },
                 "parents": [
                     {"table": parent.table, "column": parent.name}
-                    for parent in sorted(lineage.parents, key=lambda p: (p.table, p.name))
+                    for parent in sorted(lineage.parents, key=_parent_sort_key)
                 ],
-            })
-        return json.dumps(data, indent=2)
+            }
+            for lineage in lineages
+        ]
     
     @staticmethod
     def _column_lineages_to_text(lineages: List[ColumnLineage]) -> str:
@@ -131,19 +161,20 @@ class LineageFormatter:
                 <- source_table2.column2
         """
         if not lineages:
-            return "(no column lineage)"
+            return _EMPTY_COLUMN_LINEAGE_TEXT
         
         lines = []
+        append = lines.append
         for lineage in lineages:
-            target_str = f"{lineage.target.table}.{lineage.target.name}"
-            lines.append(target_str)
+            target = lineage.target
+            append(f"{target.table}.{target.name}")
             
             if lineage.parents:
-                for parent in sorted(lineage.parents, key=lambda p: (p.table, p.name)):
-                    lines.append(f"    <- {parent.table}.{parent.name}")
+                for parent in sorted(lineage.parents, key=_parent_sort_key):
+                    append(f"    <- {parent.table}.{parent.name}")
             else:
-                lines.append("    (no parent columns - literal or constant)")
+                append("    (no parent columns - literal or constant)")
             
-            lines.append("")  # Empty line between entries
+            append("")  # Empty line between entries
         
         return "\n".join(lines)
@@ -6,8 +6,9 @@ Python port of Java classes from zetasql-toolkit:
 - TableLineage (new for Python)
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, Set
+import sys
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
 
 from zetasql.types import ResolvedColumn
 
@@ -18,18 +19,40 @@ class ColumnEntity:
     
     Port of ColumnEntity.java from zetasql-toolkit.
     
+    Column names compare case-insensitively. The lowercased name and the
+    hash are computed once at construction, since entities are hashed and
+    compared repeatedly when building and probing parent sets. Table and
+    column names are interned, so equal entities share string objects and
+    equality checks short-circuit on identity. The cached values live in
+    slots rather than dataclass fields, and pickling rebuilds entities from
+    table and name so the hash is recomputed in the loading process.
+    
     Attributes:
         table: Fully qualified table name (e.g., "project.dataset.table")
         name: Column name
+        name_ci: Lowercased column name, used for comparison and lookups
         
     Example:
         >>> entity = ColumnEntity("project.dataset.table", "column_name")
         >>> entity.table
         'project.dataset.table'
     """
+    __slots__ = ("table", "name", "name_ci", "_hash")
+    
     table: str
     name: str
     
+    def __post_init__(self):
+        """Intern the names and precompute the lowercased name and the hash."""
+        table = self.table
+        if table is not None:
+            table = sys.intern(table)
+        name_ci = sys.intern(self.name.lower())
+        object.__setattr__(self, "table", table)
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "name_ci", name_ci)
+        object.__setattr__(self, "_hash", hash((table, name_ci)))
+    
     @staticmethod
     def from_resolved_column(resolved_column: ResolvedColumn) -> "ColumnEntity":
         """Create ColumnEntity from ResolvedColumn.
@@ -51,19 +74,20 @@ class ColumnEntity:
     
     def __hash__(self):
         """Hash using table name and lowercase column name for case-insensitive comparison."""
-        return hash((self.table, self.name.lower()))
+        return self._hash
     
     def __eq__(self, other):
         """Equality check with case-insensitive column name comparison."""
         if not isinstance(other, ColumnEntity):
             return False
-        return (
-            self.table == other.table and
-            self.name.lower() == other.name.lower()
-        )
+        return self.name_ci == other.name_ci and self.table == other.table
+    
+    def __reduce__(self):
+        """Pickle by table and name; the cached hash is salted per process."""
+        return (ColumnEntity, (self.table, self.name))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ColumnLineage:
     """Represents column-level lineage.
     
@@ -72,7 +96,8 @@ class ColumnLineage:
     
     Attributes:
         target: Target column entity
-        parents: Set of source column entities (terminal columns from tables)
+        parents: Frozen set of source column entities (terminal columns from
+            tables). Any iterable is accepted and frozen on construction.
         
     Example:
         >>> target = ColumnEntity("target_table", "result_col")
@@ -83,14 +108,19 @@ class ColumnLineage:
         >>> lineage = ColumnLineage(target, parents)
     """
     target: ColumnEntity
-    parents: Set[ColumnEntity] = field(default_factory=set)
+    parents: FrozenSet[ColumnEntity] = frozenset()
+    
+    def __post_init__(self):
+        """Freeze parents so lineages are immutable and hashable as-is."""
+        if not isinstance(self.parents, frozenset):
+            object.__setattr__(self, "parents", frozenset(self.parents))
     
     def __hash__(self):
-        """Hash using target and frozenset of parents."""
-        return hash((self.target, frozenset(self.parents)))
+        """Hash using target and parents."""
+        return hash((self.target, self.parents))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TableLineage:
     """Represents table-level lineage.
     
@@ -99,7 +129,8 @@ class TableLineage:
     
     Attributes:
         target: Target table name (None for SELECT queries)
-        sources: Set of source table names
+        sources: Frozen set of source table names. Any iterable is accepted
+            and frozen on construction.
         statement_type: Type of SQL statement (SELECT, INSERT, UPDATE, etc.)
         
     Example:
@@ -110,5 +141,10 @@ class TableLineage:
         ... )
     """
     target: Optional[str] = None
-    sources: Set[str] = field(default_factory=set)
+    sources: FrozenSet[str] = frozenset()
     statement_type: str = "UNKNOWN"
+    
+    def __post_init__(self):
+        """Freeze sources so lineages are immutable and hashable as-is."""
+        if not isinstance(self.sources, frozenset):
+            object.__setattr__(self, "sources", frozenset(self.sources))
@@ -5,14 +5,43 @@ Extracts source and target tables from SQL statements:
 - INSERT, UPDATE, MERGE
 """
 
-from typing import Optional, Set
+import sys
+from functools import lru_cache
+from typing import Callable, ClassVar, Dict, Optional, Set, Tuple
 
 from zetasql.api import ResolvedNodeVisitor
-from zetasql.types import ResolvedStatement
+from zetasql.types import (
+    ResolvedCreateMaterializedViewStmt,
+    ResolvedCreateTableAsSelectStmt,
+    ResolvedCreateViewStmt,
+    ResolvedNode,
+    ResolvedStatement,
+)
 
 from .models import TableLineage
 
 
+# Statement type reported for each CREATE statement with a query
+_CREATE_STATEMENT_TYPES = {
+    ResolvedCreateTableAsSelectStmt: "CREATE_TABLE_AS_SELECT",
+    ResolvedCreateViewStmt: "CREATE_VIEW",
+    ResolvedCreateMaterializedViewStmt: "CREATE_VIEW",
+}
+
+
+@lru_cache(maxsize=4096)
+def _dot_join(name_path: Tuple[str, ...]) -> str:
+    """Join a table name path with dots, interning the result.
+    
+    Args:
+        name_path: Name path parts, e.g. ("project", "dataset", "table")
+    
+    Returns:
+        Dotted table name
+    """
+    return sys.intern(".".join(name_path))
+
+
 class TableLineageExtractor(ResolvedNodeVisitor):
     """Visitor for extracting table-level lineage from resolved statements.
     
@@ -21,17 +50,41 @@ class TableLineageExtractor(ResolvedNodeVisitor):
     - Target table (from statement type-specific nodes)
     - Statement type
     
+    Traversal uses an explicit stack rather than recursive descend() calls,
+    so deeply nested queries cost no Python call frames per level. The
+    visit_* handlers only record what they need from their node; visit()
+    always walks the ResolvedNode children afterwards. Handlers are
+    resolved once per node type into a class-level dispatch table; node
+    types without a handler map to None and are only traversed.
+    
+    Subclass handlers must not call descend(), which is a no-op here;
+    children are always visited by visit(). An overridden default_visit is
+    called for unhandled nodes without their children, which visit() then
+    pushes itself.
+    
     Example:
         >>> extractor = TableLineageExtractor()
         >>> extractor.visit(resolved_statement)
         >>> lineage = extractor.get_lineage()
     """
     
+    __slots__ = ("source_tables", "target_table", "statement_type", "_skipped_node")
+    
+    # node type -> unbound visit_* function, or None when there is no handler
+    _dispatch: ClassVar[Dict[type, Optional[Callable]]] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        """Give each subclass its own dispatch table."""
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+    
     def __init__(self):
         super().__init__()
         self.source_tables: Set[str] = set()
         self.target_table: Optional[str] = None
         self.statement_type: str = "UNKNOWN"
+        # Subtree that visit() must not enter (the INSERT target scan)
+        self._skipped_node: Optional[ResolvedNode] = None
     
     def get_lineage(self) -> TableLineage:
         """Get the extracted table lineage.
@@ -41,10 +94,90 @@ class TableLineageExtractor(ResolvedNodeVisitor):
         """
         return TableLineage(
             target=self.target_table,
-            sources=self.source_tables.copy(),
+            sources=frozenset(self.source_tables),
             statement_type=self.statement_type
         )
     
+    def visit(self, node: ResolvedNode) -> None:
+        """Visit a node and all of its descendants in pre-order.
+        
+        Dispatches each node to its most specific visit_* handler through
+        the class dispatch table, then pushes its children (using the
+        field cache of ResolvedNodeVisitor) so they are visited left to
+        right.
+        
+        Args:
+            node: Root node to traverse
+        """
+        dispatch = self.__class__._dispatch
+        # _field_cache, _get_message_fields and _find_visitor_method_name are
+        # private to TreeVisitor/ResolvedNodeVisitor in the pinned
+        # zetasql==0.1.5; recheck them when upgrading zetasql.
+        field_cache = self.__class__._field_cache
+        stack = [node]
+        push = stack.append
+        while stack:
+            node = stack.pop()
+            if node is None or node is self._skipped_node:
+                continue
+            
+            node_type = type(node)
+            try:
+                handler = dispatch[node_type]
+            except KeyError:
+                handler = self._resolve_handler(node_type)
+                dispatch[node_type] = handler
+            if handler is not None:
+                handler(self, node)
+            
+            message_fields = field_cache.get(node_type)
+            if message_fields is None:
+                message_fields = self._get_message_fields(node_type)
+                field_cache[node_type] = message_fields
+            
+            # Push children last-to-first so they pop in declaration order.
+            # Only ResolvedNode children can lead to a table scan; column,
+            # type, value and function-signature messages are skipped along
+            # with everything below them.
+            for field_name, is_repeated in reversed(message_fields):
+                value = getattr(node, field_name, None)
+                if value is None:
+                    continue
+                if is_repeated:
+                    for item in reversed(value):
+                        if isinstance(item, ResolvedNode):
+                            push(item)
+                elif isinstance(value, ResolvedNode):
+                    push(value)
+    
+    def descend(self, node: ResolvedNode) -> None:
+        """Do nothing; visit() already walks every node's children.
+        
+        Overridden so handlers written in the usual ResolvedNodeVisitor
+        style, which call self.descend(node), do not walk subtrees twice.
+        
+        Args:
+            node: Node whose children visit() will traverse
+        """
+    
+    def _resolve_handler(self, node_type: type) -> Optional[Callable]:
+        """Find the visit_* function for a node type via its MRO.
+        
+        Args:
+            node_type: ResolvedNode subclass
+        
+        Returns:
+            Unbound handler function, or None if the type falls through to
+            the no-op default_visit
+        """
+        handler = getattr(self.__class__, self._find_visitor_method_name(node_type))
+        if handler is TableLineageExtractor.default_visit:
+            return None
+        return handler
+    
+    def default_visit(self, node: ResolvedNode) -> None:
+        """Nodes without a handler record nothing; visit() walks their children."""
+    
     def visit_ResolvedTableScan(self, node):
         """Visit table scan nodes to collect source tables.
         
@@ -52,8 +185,7 @@ class TableLineageExtractor(ResolvedNodeVisitor):
             node: ResolvedTableScan node
         """
         if node.table and node.table.name:
-            self.source_tables.add(node.table.name)
-        self.descend(node)
+            self.source_tables.add(sys.intern(node.table.name))
     
     def visit_ResolvedQueryStmt(self, node):
         """Visit SELECT statements.
@@ -62,51 +194,38 @@ class TableLineageExtractor(ResolvedNodeVisitor):
             node: ResolvedQueryStmt node
         """
         self.statement_type = "SELECT"
-        self.descend(node)
     
-    def visit_ResolvedCreateTableAsSelectStmt(self, node):
-        """Visit CREATE TABLE AS SELECT statements.
+    def _visit_create(self, node):
+        """Visit CREATE TABLE AS SELECT, CREATE VIEW and CREATE MATERIALIZED VIEW.
         
-        Args:
-            node: ResolvedCreateTableAsSelectStmt node
-        """
-        self.statement_type = "CREATE_TABLE_AS_SELECT"
-        if node.name_path:
-            self.target_table = ".".join(node.name_path)
-        self.descend(node)
-    
-    def visit_ResolvedCreateViewStmt(self, node):
-        """Visit CREATE VIEW statements.
+        The statement type comes from _CREATE_STATEMENT_TYPES and the target
+        from the statement's name path.
         
         Args:
-            node: ResolvedCreateViewStmt node
+            node: One of the CREATE statement nodes in _CREATE_STATEMENT_TYPES
         """
-        self.statement_type = "CREATE_VIEW"
+        self.statement_type = _CREATE_STATEMENT_TYPES[type(node)]
         if node.name_path:
-            self.target_table = ".".join(node.name_path)
-        self.descend(node)
+            self.target_table = _dot_join(tuple(node.name_path))
     
-    def visit_ResolvedCreateMaterializedViewStmt(self, node):
-        """Visit CREATE MATERIALIZED VIEW statements.
-        
-        Args:
-            node: ResolvedCreateMaterializedViewStmt node
-        """
-        self.statement_type = "CREATE_VIEW"
-        if node.name_path:
-            self.target_table = ".".join(node.name_path)
-        self.descend(node)
+    visit_ResolvedCreateTableAsSelectStmt = _visit_create
+    visit_ResolvedCreateViewStmt = _visit_create
+    visit_ResolvedCreateMaterializedViewStmt = _visit_create
     
     def visit_ResolvedInsertStmt(self, node):
         """Visit INSERT statements.
         
+        INSERT only writes its target, so the target's table scan is not
+        walked and the target is not reported as a source. A target that is
+        also read by the query is still found through the query's own scan.
+        
         Args:
             node: ResolvedInsertStmt node
         """
         self.statement_type = "INSERT"
         if node.table_scan and node.table_scan.table:
             self.target_table = node.table_scan.table.name
-        self.descend(node)
+            self._skipped_node = node.table_scan
     
     def visit_ResolvedUpdateStmt(self, node):
         """Visit UPDATE statements.
@@ -117,7 +236,6 @@ class TableLineageExtractor(ResolvedNodeVisitor):
         self.statement_type = "UPDATE"
         if node.table_scan and node.table_scan.table:
             self.target_table = node.table_scan.table.name
-        self.descend(node)
     
     def visit_ResolvedMergeStmt(self, node):
         """Visit MERGE statements.
@@ -128,7 +246,6 @@ class TableLineageExtractor(ResolvedNodeVisitor):
         self.statement_type = "MERGE"
         if node.table_scan and node.table_scan.table:
             self.target_table = node.table_scan.table.name
-        self.descend(node)
 
 
 def extract_table_lineage(statement: ResolvedStatement) -> TableLineage:
@@ -146,7 +263,7 @@ def extract_table_lineage(statement: ResolvedStatement) -> TableLineage:
         >>> stmt = analyzer.analyze_statement("SELECT * FROM table1")
         >>> lineage = extract_table_lineage(stmt)
         >>> print(lineage.sources)
-        {'table1'}
+        frozenset({'table1'})
     """
     extractor = TableLineageExtractor()
     extractor.visit(statement)